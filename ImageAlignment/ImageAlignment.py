@@ -11,9 +11,6 @@ import gettext
 from nion.swift import Application
 import logging
 
-# implementation of processing functionality defined in register.py
-import register
-
 _ = gettext.gettext  # for translation
 
 # this is the text that the menu will display
@@ -25,6 +22,9 @@ def align_selected_stack(document_controller):
     data_item = document_controller.selected_data_item
     if data_item is not None:
         logging.info("Starting image alignment.")
+        # implementation of processing functionality defined in register.py.
+        # imported here rather than at the top so that cv2 and numpy don't slow down Swift startup.
+        import register
         with data_item.data_ref() as d:
             if len(d.data.shape) is 3:
                 aligned_image = register.align_and_sum_stack(d.data)
@@ -7,7 +7,6 @@ Created on Tue Mar 11 11:13:51 2014
 
 import cv2
 import numpy as np
-import scipy as sp
 
 import dftregister
 
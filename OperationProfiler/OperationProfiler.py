@@ -0,0 +1,178 @@
+"""
+Swift scripting example: operation profiler
+Purpose: Time every call Swift makes to an operation's process method (color-phase-operation,
+   face-detection-operation, your-process-operation, ...) and report call counts, latency
+   percentiles and data sizes per operation.  Use it to find out which live operation is
+   keeping the workstation busy.
+
+Operations are instrumented as Swift builds them, so only operations created after this plugin
+is loaded are profiled.  Plugins load before any document is opened, so in practice that is all of them.
+"""
+
+# standard libraries
+import collections
+import csv
+import functools
+import gettext
+import logging
+import math
+import os
+import threading
+import time
+import timeit
+
+# local libraries
+from nion.imaging import Operation
+from nion.swift import Application
+
+_ = gettext.gettext
+
+# latencies of the most recent calls kept per operation, for the percentiles
+MAX_SAMPLES = 1000
+
+
+class OperationStatistics(object):
+    """
+    Call statistics for one operation id.
+    """
+
+    def __init__(self, operation_id):
+        self.operation_id = operation_id
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = collections.deque(maxlen=MAX_SAMPLES)
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.last_input_shape = None
+
+    def add(self, seconds, input_shape, input_bytes, output_bytes, failed):
+        self.calls += 1
+        self.errors += 1 if failed else 0
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+        self.input_bytes += input_bytes
+        self.output_bytes += output_bytes
+        self.last_input_shape = input_shape
+
+    def percentile(self, fraction):
+        # nearest-rank percentile of the recent samples
+        samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        return samples[max(int(math.ceil(fraction * len(samples))) - 1, 0)]
+
+
+class OperationProfiler(object):
+    """
+    Collects OperationStatistics for the operations Swift builds.
+
+    install wraps OperationManager.build_operation so that each new operation's process
+    method is timed.  Statistics can be read from any thread.
+    """
+
+    headers = ["Operation", "Calls", "Errors", "p50 (ms)", "p95 (ms)", "Max (ms)", "Total (s)",
+               "Last input shape", "Mean input (MB)", "Mean output (MB)"]
+
+    def __init__(self):
+        self.__statistics = dict()
+        self.__lock = threading.Lock()
+        self.__build_operation = None
+
+    def install(self, operation_manager):
+        if self.__build_operation is None:
+            self.__build_operation = operation_manager.build_operation
+            operation_manager.build_operation = self.__build_instrumented_operation
+
+    def __build_instrumented_operation(self, operation_id, *args, **kwargs):
+        operation = self.__build_operation(operation_id, *args, **kwargs)
+        if operation is not None:
+            operation.process = functools.partial(self.__timed_process, operation_id, operation.process)
+        return operation
+
+    def __timed_process(self, operation_id, process, data):
+        failed = True
+        result = None
+        start = timeit.default_timer()
+        try:
+            result = process(data)
+            failed = False
+            return result
+        finally:
+            elapsed = timeit.default_timer() - start
+            self.record(operation_id, elapsed, getattr(data, "shape", None), getattr(data, "nbytes", 0),
+                        getattr(result, "nbytes", 0), failed)
+
+    def record(self, operation_id, seconds, input_shape=None, input_bytes=0, output_bytes=0, failed=False):
+        with self.__lock:
+            statistics = self.__statistics.get(operation_id)
+            if statistics is None:
+                statistics = self.__statistics.setdefault(operation_id, OperationStatistics(operation_id))
+            statistics.add(seconds, input_shape, input_bytes, output_bytes, failed)
+
+    def reset(self):
+        with self.__lock:
+            self.__statistics.clear()
+
+    def get_rows(self):
+        """
+        Return one row of formatted values per operation, slowest total time first.
+        """
+        megabyte = 1024.0 * 1024.0
+        rows = list()
+        with self.__lock:
+            all_statistics = sorted(self.__statistics.values(), key=lambda s: s.total_seconds, reverse=True)
+            for s in all_statistics:
+                rows.append([s.operation_id, str(s.calls), str(s.errors),
+                             "{:.1f}".format(s.percentile(0.50) * 1000), "{:.1f}".format(s.percentile(0.95) * 1000),
+                             "{:.1f}".format(s.max_seconds * 1000), "{:.2f}".format(s.total_seconds),
+                             "x".join(str(n) for n in s.last_input_shape) if s.last_input_shape else "-",
+                             "{:.2f}".format(s.input_bytes / megabyte / s.calls),
+                             "{:.2f}".format(s.output_bytes / megabyte / s.calls)])
+        return rows
+
+    def export_csv(self, file_path):
+        with open(file_path, "wb") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers)
+            writer.writerows(self.get_rows())
+
+
+profiler = OperationProfiler()
+profiler.install(Operation.OperationManager())
+
+
+# This function will run on a thread, like the time lapse example, so the task table
+# can be shown without blocking the UI.
+def show_profile(document_controller):
+    with document_controller.create_task_context_manager(_("Operation Profile"), "table") as task:
+        rows = profiler.get_rows()
+        task_data = {"headers": profiler.headers, "data": rows}
+        task.update_progress(_("{} operations profiled.").format(len(rows)), (1, 1), task_data)
+
+
+def export_profile():
+    file_name = time.strftime("operation_profile_%Y%m%d_%H%M%S.csv", time.localtime())
+    file_path = os.path.join(os.path.expanduser("~"), file_name)
+    profiler.export_csv(file_path)
+    logging.info("operation profile written to %s", file_path)
+
+
+def reset_profile():
+    profiler.reset()
+    logging.info("operation profile reset")
+
+
+# the build_menus function will be called whenever a new document window is created.
+def build_menus(document_controller):
+    profile_menu = document_controller.get_or_create_menu("script_menu", _("Scripts"), "window_menu")
+    profile_menu.add_menu_item(_("Show Operation Profile"),
+                               lambda: threading.Thread(target=show_profile, args=(document_controller, )).start())
+    profile_menu.add_menu_item(_("Export Operation Profile to CSV"), lambda: export_profile())
+    profile_menu.add_menu_item(_("Reset Operation Profile"), lambda: reset_profile())
+
+
+# register the menu handler with the application.
+Application.app.register_menu_handler(build_menus)
@@ -0,0 +1 @@
+import OperationProfiler
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Swift scripting example: stack projections (live operation)
+Purpose: Collapse a 3D stack along its first axis (sum, mean, maximum, minimum, variance).
+   The stack is reduced a few slices at a time, so the working memory on top of the stack itself
+   is the 2D result plus one chunk converted to float64 (complex128 for complex data) per thread.
+   With several threads, reduced chunks waiting to be merged also take one 2D array each.
+
+To make your own reduction, subclass StackReducer and pass an instance to StackReductionOperation.
+"""
+
+# standard libraries
+import gettext
+import multiprocessing.pool
+
+# third party libraries
+import numpy
+
+# Nion imports
+from nion.imaging import Operation
+from nion.swift import Application
+
+_ = gettext.gettext
+
+# target size of the float64 working copy of each chunk
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+
+def accumulation_dtype(data_dtype):
+    return numpy.dtype(numpy.complex128 if numpy.issubdtype(data_dtype, numpy.complexfloating) else numpy.float64)
+
+
+class StackReducer(object):
+    """
+    A streaming reduction over the slices of a stack.
+
+    reduce_chunk turns a chunk of slices into a partial state.  If it is given out, the result
+    shaped part of the state is accumulated in out, so no separate result buffer is needed.
+    combine merges another partial state into state, in place, and in any order, so chunks can
+    be reduced in parallel.  finalize turns the final state into the result in out.
+    """
+
+    def get_output_dtype(self, data_dtype):
+        return accumulation_dtype(data_dtype)
+
+    def reduce_chunk(self, chunk, out=None):
+        raise NotImplementedError()
+
+    def combine(self, state, other):
+        raise NotImplementedError()
+
+    def finalize(self, state, out):
+        raise NotImplementedError()
+
+
+class SumReducer(StackReducer):
+
+    def reduce_chunk(self, chunk, out=None):
+        return chunk.shape[0], chunk.sum(axis=0, dtype=self.get_output_dtype(chunk.dtype), out=out)
+
+    def combine(self, state, other):
+        total = state[1]
+        total += other[1]
+        return state[0] + other[0], total
+
+    def finalize(self, state, out):
+        if state[1] is not out:
+            out[...] = state[1]
+
+
+class MeanReducer(SumReducer):
+
+    def finalize(self, state, out):
+        super(MeanReducer, self).finalize(state, out)
+        out /= state[0]
+
+
+class MaximumReducer(StackReducer):
+    """
+    Maximum projection.  Keeps the input dtype, so no float conversion takes place.
+    Complex data has no ordering, so it is rejected.
+    """
+
+    ufunc = numpy.maximum
+
+    def get_output_dtype(self, data_dtype):
+        if numpy.issubdtype(data_dtype, numpy.complexfloating):
+            raise ValueError("cannot take a maximum or minimum projection of complex data")
+        return numpy.dtype(data_dtype)
+
+    def reduce_chunk(self, chunk, out=None):
+        return self.ufunc.reduce(chunk, axis=0, out=out)
+
+    def combine(self, state, other):
+        return self.ufunc(state, other, state)
+
+    def finalize(self, state, out):
+        if state is not out:
+            out[...] = state
+
+
+class MinimumReducer(MaximumReducer):
+
+    ufunc = numpy.minimum
+
+
+class VarianceReducer(StackReducer):
+    """
+    Population variance from running moments (count, mean, sum of squared deviations).
+    For complex data the squared deviation is |x - mean|^2, so the variance is real.
+
+    Chunks are merged with the pairwise update of Chan et al., which avoids the catastrophic
+    cancellation of the naive sum-of-squares formula.
+    """
+
+    def get_output_dtype(self, data_dtype):
+        return numpy.dtype(numpy.float64)
+
+    def reduce_chunk(self, chunk, out=None):
+        mean = chunk.mean(axis=0, dtype=accumulation_dtype(chunk.dtype))
+        deviation = chunk - mean
+        m2 = numpy.einsum("i...,i...->...", deviation.real, deviation.real, out=out)
+        if numpy.iscomplexobj(deviation):
+            m2 += numpy.einsum("i...,i...->...", deviation.imag, deviation.imag)
+        return chunk.shape[0], mean, m2
+
+    def combine(self, state, other):
+        count_a, mean_a, m2_a = state
+        count_b, mean_b, m2_b = other
+        count = count_a + count_b
+        delta = mean_b - mean_a
+        mean_a += delta * (float(count_b) / count)
+        m2_a += m2_b
+        m2_a += (delta.real ** 2 + delta.imag ** 2) * (float(count_a) * count_b / count)
+        return count, mean_a, m2_a
+
+    def finalize(self, state, out):
+        if state[2] is not out:
+            out[...] = state[2]
+        out /= state[0]
+
+
+def reduce_stack(data, reducer, out, chunk_bytes=DEFAULT_CHUNK_BYTES, threads=1):
+    """
+    Reduce data along its first axis into out, reading chunk_bytes worth of slices at a time.
+
+    Single threaded, the result is accumulated directly in out.  With threads > 1, chunks are
+    reduced on a thread pool and merged as they finish; numpy releases the GIL for the bulk of
+    the work, so this helps on multi-core machines at the cost of one chunk of memory per thread.
+    Returns out.
+    """
+    if data.shape[0] == 0:
+        raise ValueError("cannot reduce an empty stack")
+    slice_bytes = max(numpy.prod(data.shape[1:]) * accumulation_dtype(data.dtype).itemsize, 1)
+    chunk_size = int(max(chunk_bytes // slice_bytes, 1))
+    starts = range(0, data.shape[0], chunk_size)
+
+    def reduce_chunk(start, out=None):
+        return reducer.reduce_chunk(data[start:start + chunk_size], out)
+
+    if threads > 1 and len(starts) > 1:
+        state = None
+        pool = multiprocessing.pool.ThreadPool(min(threads, len(starts)))
+        try:
+            for partial in pool.imap_unordered(reduce_chunk, starts):
+                state = partial if state is None else reducer.combine(state, partial)
+        finally:
+            pool.terminate()
+    else:
+        state = reduce_chunk(starts[0], out)
+        for start in starts[1:]:
+            state = reducer.combine(state, reduce_chunk(start))
+    reducer.finalize(state, out)
+    return out
+
+
+class StackReductionOperation(Operation.Operation):
+    """
+    An operation which collapses a 3D stack to 2D using a StackReducer.
+    """
+
+    def __init__(self, name, operation_id, reducer):
+        description = [
+                    { "name": _("Threads"), "property": "threads", "type": "integer-field", "default": 1 }
+                ]
+        super(StackReductionOperation, self).__init__(name, operation_id, description)
+        self.threads = 1
+        self.reducer = reducer
+        self.chunk_bytes = DEFAULT_CHUNK_BYTES
+
+    def process(self, data):
+        # the output is allocated once, at its final size; single threaded, the reducer accumulates into it.
+        shape, dtype = self.get_processed_data_shape_and_dtype(data.shape, data.dtype)
+        out = numpy.empty(shape, dtype)
+        threads = max(int(self.get_property("threads")), 1)
+        return reduce_stack(data, self.reducer, out, self.chunk_bytes, threads)
+
+    def get_processed_data_shape_and_dtype(self, data_shape, data_dtype):
+        return data_shape[1:], self.reducer.get_output_dtype(data_dtype)
+
+    def get_processed_spatial_calibrations(self, data_shape, data_dtype, spatial_calibrations):
+        # the stack axis is gone
+        return spatial_calibrations[1:]
+
+
+# operation id, menu text, result name prefix, reducer class
+projections = [
+    ("stack-sum-operation", _("Stack Sum"), _("Sum of "), SumReducer),
+    ("stack-mean-operation", _("Stack Mean"), _("Mean of "), MeanReducer),
+    ("stack-maximum-operation", _("Stack Maximum Projection"), _("Maximum of "), MaximumReducer),
+    ("stack-minimum-operation", _("Stack Minimum Projection"), _("Minimum of "), MinimumReducer),
+    ("stack-variance-operation", _("Stack Variance"), _("Variance of "), VarianceReducer),
+]
+
+
+def build_menus(document_controller):
+    """
+    makes the menu entries for the stack projections
+    """
+    for operation_id, name, prefix, reducer_class in projections:
+        # bind the loop variables as defaults, otherwise every entry would use the last projection
+        operation_callback = lambda operation_id=operation_id, prefix=prefix: \
+            document_controller.add_processing_operation_by_id(operation_id, prefix=prefix)
+        document_controller.processing_menu.add_menu_item(name, operation_callback)
+
+Application.app.register_menu_handler(build_menus) # called on import to make the menu entries
+
+for operation_id, name, prefix, reducer_class in projections:
+    Operation.OperationManager().register_operation(operation_id,
+        lambda operation_id=operation_id, name=name, reducer_class=reducer_class:
+            StackReductionOperation(name, operation_id, reducer_class()))
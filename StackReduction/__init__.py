@@ -0,0 +1 @@
+import StackReduction
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Swift scripting example: result memoization for live operations
+Purpose: Swift calls an operation's process method whenever it wants the processed data,
+   including when nothing has changed (a display redraw, for instance).  Mix CachedOperation
+   into your operation class to return the previous result instead of recomputing it.
+
+Usage:
+
+    class YourOperation(CachedOperation.CachedOperation, Operation.Operation):
+        cached_properties = ("scalar_example", )
+
+        def process_uncached(self, data):
+            return your_processing_function(data, self.get_property("scalar_example"))
+
+Results are keyed on a fingerprint of the input data plus the values of the properties
+named in cached_properties, so any property that affects the result must be listed there.
+"""
+
+# standard libraries
+import collections
+import threading
+import zlib
+
+# third party libraries
+import numpy
+
+# 64 MB of cached results per operation instance
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _contiguous_blocks(data):
+    # yields the array as pieces whose memory can be read directly, without copying the whole array
+    if data.flags.c_contiguous:
+        yield data
+    elif data.ndim == 1:
+        # a strided row; copying one row is cheap
+        yield numpy.ascontiguousarray(data)
+    else:
+        for sub_data in data:
+            for block in _contiguous_blocks(sub_data):
+                yield block
+
+
+def data_fingerprint(data):
+    """
+    Return a hashable fingerprint of the array contents.
+
+    The fingerprint is an Adler-32 checksum of every byte together with the shape, dtype and strides.
+    The checksum is computed on every call, cache hits included, at roughly memory bandwidth, so
+    caching only pays off for operations that take noticeably longer than one pass over their input.
+    A 32-bit checksum can collide, so in rare cases changed data could return a stale result.
+    """
+    checksum = 1
+    for block in _contiguous_blocks(data):
+        if block.size:
+            checksum = zlib.adler32(block.ravel().view(numpy.uint8), checksum)
+    return data.shape, data.dtype.str, data.strides, checksum
+
+
+def _hashable(value):
+    # point properties can come back as lists; dictionaries are possible for custom types.
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+class CachedOperation(object):
+    """
+    Mixin for Operation subclasses which memoizes process results in a bounded LRU cache.
+
+    Subclasses implement process_uncached instead of process and list the properties that affect
+    the result in cached_properties.  The cache is limited to cache_max_bytes of result data;
+    least recently used results are dropped first and results larger than the budget are never stored.
+
+    Cached results are returned without copying and are made read-only, so a caller that tries to
+    modify one gets an error instead of silently changing the cache.
+
+    cache_hits and cache_misses count lookups since the operation was created (or clear_cache was called).
+    """
+
+    cached_properties = ()
+    cache_max_bytes = DEFAULT_CACHE_BYTES
+
+    def __init__(self, *args, **kwargs):
+        super(CachedOperation, self).__init__(*args, **kwargs)
+        self.__cache = collections.OrderedDict()
+        self.__cache_bytes = 0
+        self.__cache_lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def process_uncached(self, data):
+        """
+        Compute the result for data.  Subclasses must override this method.
+        """
+        raise NotImplementedError()
+
+    def get_cache_key(self, data):
+        """
+        Return the key used to look up results for data with the current property values.
+        """
+        properties = tuple((name, _hashable(self.get_property(name))) for name in self.cached_properties)
+        return data_fingerprint(data), properties
+
+    @property
+    def cache_bytes(self):
+        return self.__cache_bytes
+
+    def clear_cache(self):
+        with self.__cache_lock:
+            self.__cache.clear()
+            self.__cache_bytes = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def process(self, data):
+        """
+        Return the cached result for data if there is one, otherwise compute and cache it.
+        """
+        key = self.get_cache_key(data)
+        with self.__cache_lock:
+            result = self.__cache.pop(key, None)
+            if result is not None:
+                # re-insert to mark as most recently used
+                self.__cache[key] = result
+                self.cache_hits += 1
+                return result
+            self.cache_misses += 1
+        # compute outside the lock so a slow computation doesn't block other callers
+        result = self.process_uncached(data)
+        if result is not None:
+            if numpy.may_share_memory(result, data):
+                # a view on the input would silently change along with it
+                result = result.copy()
+            result.flags.writeable = False
+            self.__store(key, result)
+        return result
+
+    def __store(self, key, result):
+        result_bytes = result.nbytes
+        if result_bytes > self.cache_max_bytes:
+            return
+        with self.__cache_lock:
+            if key in self.__cache:
+                self.__cache_bytes -= self.__cache.pop(key).nbytes
+            while self.__cache and self.__cache_bytes + result_bytes > self.cache_max_bytes:
+                _key, evicted = self.__cache.popitem(last=False)
+                self.__cache_bytes -= evicted.nbytes
+            self.__cache[key] = result
+            self.__cache_bytes += result_bytes
@@ -93,6 +93,24 @@ class ProcessOperation(Operation.Operation):
         return spatial_calibrations
 
 
+# If your process is slow and Swift often asks for the same result again (display redraws, for instance),
+# CachedOperation (in CachedOperation.py) can remember recent results.  To use it, import CachedOperation
+# at the top of this file and define your operation like this instead:
+#
+# class ProcessOperation(CachedOperation.CachedOperation, Operation.Operation):
+#     # EVERY property that affects the result must be listed here, otherwise stale results are returned.
+#     cached_properties = ("point_example", "scalar_example", "integer_example")
+#
+#     def __init__(self):
+#         ... same as above ...
+#
+#     def process_uncached(self, data):
+#         ... the body of process above ...
+#
+# Every call, including repeated ones, still reads through the whole input to fingerprint it,
+# so this only pays off when your processing costs noticeably more than that.
+
+
 # The following is code for making this into a menu entry on the processing menu.  You shouldn't need to change it.
 
 def build_menus(document_controller):
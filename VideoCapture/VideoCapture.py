@@ -6,9 +6,8 @@ import threading
 import time
 
 # third party libraries
-# see http://docs.opencv.org/index.html
-import cv2
-import cv2.cv as cv
+# cv2 (see http://docs.opencv.org/index.html) is imported by the functions that use it,
+# so that loading this plugin doesn't add OpenCV's import time to Swift startup.
 
 # local libraries
 from nion.swift import HardwareSource
@@ -19,6 +18,7 @@ _ = gettext.gettext
 # does not currently work. to switch to this, copy the hardware source code out of
 # simulator mp and enable this. add necessary imports too.
 def video_capture_process(buffer, cancel_event, ready_event, done_event):
+    import cv2
     logging.debug("video capture process start")
     video_capture = cv2.VideoCapture(0)
     logging.debug("video capture: %s", video_capture)
@@ -77,6 +77,8 @@ class VideoCaptureHardwareSource(HardwareSource.HardwareSource):
         super(VideoCaptureHardwareSource, self).__init__(self.hardware_source_id, self.hardware_source)
 
     def start_acquisition(self, mode, mode_data):
+        import cv2
+        import cv2.cv as cv
         video_capture = cv2.VideoCapture(0)
         width = video_capture.get(cv.CV_CAP_PROP_FRAME_WIDTH)
         height = video_capture.get(cv.CV_CAP_PROP_FRAME_HEIGHT)
@@ -107,4 +109,5 @@ class VideoCaptureHardwareSource(HardwareSource.HardwareSource):
         self.thread.join()
 
 
+# Creating the hardware source is cheap: the camera is only opened (and cv2 imported) when acquisition starts.
 HardwareSource.HardwareSourceManager().register_hardware_source(VideoCaptureHardwareSource())
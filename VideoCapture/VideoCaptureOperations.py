@@ -1,9 +1,8 @@
 import gettext
 
 # third party libraries
-# see http://docs.opencv.org/index.html
-import cv2
-import cv2.cv as cv
+# cv2 (see http://docs.opencv.org/index.html) is imported by the functions that use it,
+# so that loading this plugin doesn't add OpenCV's import time to Swift startup.
 import numpy
 
 # local libraries
@@ -15,12 +14,16 @@ _ = gettext.gettext  # for translation
 
 
 def draw_rects(img, rects, color):
+    import cv2
     for x1, y1, x2, y2 in rects:
         cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
 
 
-def detect(img, cascade_fn, scaleFactor=1.3, minNeighbors=4, minSize=(20, 20), flags=cv.CV_HAAR_SCALE_IMAGE):
-
+def detect(img, cascade_fn, scaleFactor=1.3, minNeighbors=4, minSize=(20, 20), flags=None):
+    import cv2
+    import cv2.cv as cv
+    if flags is None:
+        flags = cv.CV_HAAR_SCALE_IMAGE
     cascade = cv2.CascadeClassifier(cascade_fn)
     rects = cascade.detectMultiScale(img, scaleFactor=scaleFactor, minNeighbors=minNeighbors, minSize=minSize, flags=flags)
     if len(rects) == 0:
@@ -35,6 +38,8 @@ class FaceDetectionOperation(Operation.Operation):
         super(FaceDetectionOperation, self).__init__(_("Face Detection"), "face-detection-operation")
 
     def process(self, data):
+        import cv2
+        import cv2.cv as cv
         img = Image.create_rgba_image_from_array(data)  # inefficient since we're just converting back to gray
         if id(img) == id(data):
             img = img.copy()
@@ -0,0 +1,138 @@
+"""
+Measure how much each plugin in this directory adds to Swift startup time.
+Purpose: Every plugin is imported when Swift starts, so slow imports (OpenCV, SciPy, hardware setup)
+   delay the first window for everyone.  Run this after changing a plugin to see what it costs.
+
+Usage: python measure_plugin_startup.py [--repeat N] [PluginName ...]
+
+Each plugin is imported in a fresh interpreter that has already loaded the parts of Swift and numpy
+that Swift itself loads, so the reported time is what the plugin adds on top of Swift.
+The menu handlers each plugin registers are then called once with a stand-in document controller
+and timed separately, since Swift calls them for every new document window.
+The fastest of N runs is reported.  Needs the same Python environment Swift runs in.
+"""
+
+# standard libraries
+from __future__ import print_function
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+plugins_dir = os.path.dirname(os.path.abspath(__file__))
+
+# modules which are already imported by the time Swift loads plugins
+baseline_modules = ["numpy", "nion.imaging.Image", "nion.imaging.Operation",
+                    "nion.swift.Application", "nion.swift.HardwareSource"]
+
+# modules which are expensive to import; the report shows which plugins pull them in
+watched_modules = ["cv2", "scipy", "matplotlib", "PIL"]
+
+
+class RecordingApplication(object):
+    """
+    Stands in for the Swift application when plugins are imported outside of Swift.
+    """
+
+    def __init__(self):
+        self.menu_handlers = list()
+
+    def register_menu_handler(self, menu_handler):
+        self.menu_handlers.append(menu_handler)
+
+
+class RecordingObject(object):
+    """
+    Stands in for a document controller when menu handlers run outside of Swift.
+    Any attribute can be read and any call succeeds, returning another RecordingObject.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = RecordingObject()
+        setattr(self, name, value)
+        return value
+
+    def __call__(self, *args, **kwargs):
+        return RecordingObject()
+
+
+def find_plugins():
+    return sorted(name for name in os.listdir(plugins_dir)
+                  if os.path.isfile(os.path.join(plugins_dir, name, "__init__.py")))
+
+
+def measure_in_this_process(plugin_name):
+    sys.path.insert(0, plugins_dir)
+    for module_name in baseline_modules:
+        __import__(module_name)
+    from nion.swift import Application
+    application = RecordingApplication()
+    Application.app = application
+    modules_before = set(sys.modules)
+    start = time.time()
+    __import__(plugin_name)
+    elapsed = time.time() - start
+    start = time.time()
+    for menu_handler in application.menu_handlers:
+        menu_handler(RecordingObject())
+    menu_elapsed = time.time() - start
+    new_modules = set(sys.modules) - modules_before
+    return {
+        "seconds": elapsed,
+        "menu_seconds": menu_elapsed,
+        "modules": len(new_modules),
+        "heavy": sorted(name for name in watched_modules if name in new_modules),
+    }
+
+
+def measure(plugin_name):
+    """
+    Import plugin_name in a child interpreter and return its measurement, or raise RuntimeError.
+    """
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", plugin_name],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        message = stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(message[-1] if message else "exit code {}".format(process.returncode))
+    return json.loads(stdout.decode("utf-8").strip().splitlines()[-1])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Report the import time of each Swift plugin.")
+    parser.add_argument("plugins", nargs="*", help="plugin package names (default: all in this directory)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per plugin; the fastest is reported")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_in_this_process(args.child)))
+        return 0
+
+    status = 0
+    total = 0.0
+    menu_total = 0.0
+    print("{:<20} {:>10} {:>10} {:>8}  {}".format("Plugin", "Time (ms)", "Menus (ms)", "Modules", "Heavy imports"))
+    for plugin_name in args.plugins or find_plugins():
+        try:
+            results = [measure(plugin_name) for _ in range(max(args.repeat, 1))]
+        except RuntimeError as e:
+            print("{:<20} failed: {}".format(plugin_name, e))
+            status = 1
+            continue
+        result = min(results, key=lambda result: result["seconds"])
+        total += result["seconds"]
+        menu_total += result["menu_seconds"]
+        print("{:<20} {:>10.1f} {:>10.1f} {:>8}  {}".format(plugin_name, result["seconds"] * 1000,
+                                                           result["menu_seconds"] * 1000, result["modules"],
+                                                           ", ".join(result["heavy"]) or "-"))
+    print("{:<20} {:>10.1f} {:>10.1f}".format("Total", total * 1000, menu_total * 1000))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))